@@ -11,15 +11,14 @@
 # express or implied. See the License for the specific language governing
 # permissions and limitations under the License.
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-import dill
 from tqdm import tqdm
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, FrozenSet, List, Optional, Tuple, Union
 import pandas as pd
-from datetime import datetime
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -90,26 +89,43 @@ plot_range = {
 }
 
 
+# columns of the results dataframes used by the analysis, in addition to the
+# metric itself
+result_columns = [
+    "algorithm",
+    "tuner_name",
+    "seed",
+    "metric_names",
+    "metric_mode",
+    ST_TUNER_TIME,
+]
+
+
+class _NameFilter:
+    """
+    Path filter keeping experiments whose tuner name is in ``valid_exps``.
+    Defined at module level so that it can be sent to worker processes.
+    """
+
+    __slots__ = ("valid_exps",)
+
+    def __init__(self, valid_exps: FrozenSet[str]):
+        self.valid_exps = valid_exps
+
+    def __call__(self, path: str) -> bool:
+        # ``path`` points to a file in the experiment directory named after the
+        # tuner. String operations avoid creating a ``Path`` for every file
+        return os.path.basename(os.path.dirname(path)) in self.valid_exps
+
+
+def _load_one(valid_exps: FrozenSet[str], columns: List[str]) -> pd.DataFrame:
+    return load_experiments_df(_NameFilter(valid_exps), columns=columns)
+
+
 def generate_df_dict(
-    tag=None, date_min=None, date_max=None, methods_to_show=None
+    tag=None, date_min=None, date_max=None, methods_to_show=None, verbose=False
 ) -> Dict[str, pd.DataFrame]:
     # todo load one df per task would be more efficient
-    def metadata_filter(metadata, benchmark=None, tag=None):
-        if methods_to_show is not None and not metadata["algorithm"] in methods_to_show:
-            return False
-        if benchmark is not None and metadata["benchmark"] != benchmark:
-            return False
-        if tag is not None:
-            if not isinstance(tag, list):
-                tag = [tag]
-            if not metadata["tag"] in tag:
-                return False
-        if date_min is None or date_max is None:
-            return True
-        else:
-            date_exp = datetime.fromtimestamp(metadata["st_tuner_creation_timestamp"])
-            return date_min <= date_exp <= date_max
-
     metadatas = get_metadata()
     if tag is not None:
         if not isinstance(tag, list):
@@ -124,49 +140,122 @@ def generate_df_dict(
             for key in ["algorithm", "benchmark", "tag", "st_tuner_creation_timestamp"]
         )
     }
-    metadata_df = pd.DataFrame(metadatas.values())
-    metadata_df["creation_date"] = metadata_df["st_tuner_creation_timestamp"].apply(
-        lambda x: datetime.fromtimestamp(x)
-    )
-    metadata_df.sort_values(by="creation_date", ascending=False)
-    metadata_df = metadata_df.drop_duplicates(["algorithm", "benchmark", "seed"])
-    creation_dates_min_max = metadata_df.groupby(["algorithm"]).agg(["min", "max"])[
-        "creation_date"
-    ]
-    print("creation date per method:\n" + creation_dates_min_max.to_string())
-
-    count_per_seed = (
-        metadata_df.groupby(["algorithm", "benchmark", "seed"]).count()["tag"].unstack()
+    # typed columns, so that filtering and grouping avoid ``object`` dtype
+    names = np.array(list(metadatas.keys()))
+    values = list(metadatas.values())
+    metadata_df = pd.DataFrame(
+        {
+            "algorithm": pd.Categorical([m["algorithm"] for m in values]),
+            "benchmark": pd.Categorical([m["benchmark"] for m in values]),
+            "tag": pd.Categorical([m["tag"] for m in values]),
+            "st_tuner_creation_timestamp": np.fromiter(
+                (m["st_tuner_creation_timestamp"] for m in values),
+                dtype=np.float64,
+                count=len(values),
+            ),
+            "seed": np.fromiter(
+                (m.get("seed", -1) for m in values), dtype=np.int64, count=len(values)
+            ),
+        },
+        index=names,
     )
-    print("num seeds per methods: \n" + count_per_seed.to_string())
-
-    num_seed_per_method = (
-        metadata_df.groupby(["algorithm", "benchmark"]).count()["tag"].unstack()
-    )
-    print("seeds present: \n" + num_seed_per_method.to_string())
-
-    benchmarks = list(sorted(metadata_df.benchmark.dropna().unique()))
 
-    benchmark_to_df = {}
-
-    for benchmark in tqdm(benchmarks):
-        valid_exps = set(
-            [
-                name
-                for name, metadata in metadatas.items()
-                if metadata_filter(metadata, benchmark, tag)
-            ]
+    # experiments to load for each benchmark, filtered with a single mask
+    mask = pd.Series(True, index=metadata_df.index)
+    if methods_to_show is not None:
+        mask &= metadata_df.algorithm.isin(methods_to_show)
+    if tag is not None:
+        mask &= metadata_df.tag.isin(tag)
+    if date_min is not None and date_max is not None:
+        mask &= metadata_df.st_tuner_creation_timestamp.between(
+            date_min.timestamp(), date_max.timestamp()
         )
-        if len(valid_exps) > 0:
+    valid_by_benchmark = metadata_df[mask].groupby("benchmark", observed=True).groups
 
-            def name_filter(path):
-                tuner_name = Path(path).parent.stem
-                return tuner_name in valid_exps
-
-            df = load_experiments_df(name_filter)
-            benchmark_to_df[benchmark] = df
+    if verbose:
+        metadata_df["creation_date"] = pd.to_datetime(
+            metadata_df["st_tuner_creation_timestamp"], unit="s"
+        )
+        metadata_df.sort_values(by="creation_date", ascending=False)
+        metadata_df = metadata_df.drop_duplicates(["algorithm", "benchmark", "seed"])
+        creation_dates_min_max = metadata_df.groupby("algorithm", observed=True)[
+            "creation_date"
+        ].agg(["min", "max"])
+        print("creation date per method:\n" + creation_dates_min_max.to_string())
+
+        count_per_seed = (
+            metadata_df.groupby(["algorithm", "benchmark", "seed"], observed=True)
+            .count()["tag"]
+            .unstack()
+        )
+        print("num seeds per methods: \n" + count_per_seed.to_string())
 
-    return benchmark_to_df
+        num_seed_per_method = (
+            metadata_df.groupby(["algorithm", "benchmark"], observed=True)
+            .count()["tag"]
+            .unstack()
+        )
+        print("seeds present: \n" + num_seed_per_method.to_string())
+
+    benchmarks = sorted(valid_by_benchmark.keys())
+    if len(benchmarks) == 0:
+        return {}
+
+    # experiments of different benchmarks are loaded in parallel
+    dfs = {}
+    max_workers = min(len(benchmarks), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = dict()
+        for benchmark in benchmarks:
+            valid_exps = frozenset(valid_by_benchmark[benchmark])
+            # all experiments of a benchmark report the same metric
+            metric_names = metadatas[next(iter(valid_exps))].get("metric_names", [])
+            future = executor.submit(
+                _load_one, valid_exps, result_columns + list(metric_names)
+            )
+            futures[future] = benchmark
+        for future in tqdm(as_completed(futures), total=len(futures)):
+            dfs[futures[future]] = future.result()
+
+    return {benchmark: dfs[benchmark] for benchmark in benchmarks}
+
+
+def _split_by_tuner(x: np.ndarray, tuner_id: np.ndarray) -> List[np.ndarray]:
+    """
+    :param x: Array with rows sorted by tuner
+    :param tuner_id: Tuner index of each row of ``x``
+    :return: List of views of ``x``, one per tuner
+    """
+    return np.split(x, np.flatnonzero(np.diff(tuner_id)) + 1)
+
+
+def _pack(
+    df_task: pd.DataFrame, metric: str, mode: str
+) -> Dict[str, Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Extracts the columns needed for plotting and ranking from ``df_task`` into
+    NumPy arrays, once per algorithm.
+
+    :param df_task: Results of one benchmark
+    :param metric: Name of the metric column
+    :param mode: "min" or "max"
+    :return: Dictionary from algorithm to ``(t, y_best, tuner_id)``, with rows
+        sorted by tuner and time. ``tuner_id`` is the integer index of the tuner
+        and ``y_best`` the best metric value this tuner obtained so far
+    """
+    # fmax/fmin skip missing values, as ``cummax``/``cummin`` of pandas do
+    accumulate = np.fmax.accumulate if mode == "max" else np.fmin.accumulate
+    packed = {}
+    for algorithm, df_scheduler in df_task.groupby("algorithm", sort=False):
+        tuner_id, _ = pd.factorize(df_scheduler.tuner_name)
+        t = df_scheduler[ST_TUNER_TIME].to_numpy()
+        order = np.lexsort((t, tuner_id))
+        tuner_id = tuner_id[order]
+        y_best = df_scheduler[metric].to_numpy()[order]
+        for y_tuner in _split_by_tuner(y_best, tuner_id):
+            accumulate(y_tuner, out=y_tuner)
+        packed[algorithm] = (t[order], y_best, tuner_id)
+    return packed
 
 
 def plot_result_benchmark(
@@ -176,6 +265,7 @@ def plot_result_benchmark(
     method_styles: Optional[Dict] = None,
     ax=None,
     methods_to_show: list = None,
+    num_grid: int = 50,
 ):
     agg_results = {}
     if len(df_task) > 0:
@@ -184,35 +274,25 @@ def plot_result_benchmark(
 
         if ax is None:
             fig, ax = plt.subplots()
+        packed = _pack(df_task, metric, mode)
         for algorithm, method_style in method_styles.items():
             if methods_to_show is not None and algorithm not in methods_to_show:
                 continue
-            ts = []
-            ys = []
-
-            df_scheduler = df_task[df_task.algorithm == algorithm]
-            if len(df_scheduler) == 0:
+            if algorithm not in packed:
                 continue
-            for i, tuner_name in enumerate(df_scheduler.tuner_name.unique()):
-                sub_df = df_scheduler[df_scheduler.tuner_name == tuner_name]
-                sub_df = sub_df.sort_values(ST_TUNER_TIME)
-                t = sub_df.loc[:, ST_TUNER_TIME].values
-                y_best = (
-                    sub_df.loc[:, metric].cummax().values
-                    if mode == "max"
-                    else sub_df.loc[:, metric].cummin().values
-                )
-                if show_seeds:
+            t, y_best, tuner_id = packed[algorithm]
+            ts = _split_by_tuner(t, tuner_id)
+            ys = _split_by_tuner(y_best, tuner_id)
+            if show_seeds:
+                for t_tuner, y_tuner in zip(ts, ys):
                     ax.plot(
-                        t,
-                        y_best,
+                        t_tuner,
+                        y_tuner,
                         color=method_style.color,
                         linestyle=method_style.linestyle,
                         marker=method_style.marker,
                         alpha=0.2,
                     )
-                ts.append(t)
-                ys.append(y_best)
 
             # compute the mean/std over time-series of different seeds at regular time-steps
             # start/stop at respectively first/last point available for all seeds
@@ -220,15 +300,13 @@ def plot_result_benchmark(
             t_max = min(tt[-1] for tt in ts)
             if t_min > t_max:
                 continue
-            t_range = np.linspace(t_min, t_max)
+            t_range = np.linspace(t_min, t_max, num_grid)
 
             # find the best value at each regularly spaced time-step from t_range
-            y_ranges = []
-            for t, y in zip(ts, ys):
-                indices = np.searchsorted(t, t_range, side="left")
-                y_range = y[indices]
-                y_ranges.append(y_range)
-            y_ranges = np.stack(y_ranges)
+            y_ranges = np.empty((len(ts), t_range.size), dtype=y_best.dtype)
+            for i, (t_tuner, y_tuner) in enumerate(zip(ts, ys)):
+                indices = np.searchsorted(t_tuner, t_range, side="left")
+                y_ranges[i] = y_tuner[indices.clip(max=len(y_tuner) - 1)]
 
             mean = y_ranges.mean(axis=0)
             std = y_ranges.std(axis=0)
@@ -270,6 +348,7 @@ def plot_results(
     title: str = None,
     ax=None,
     methods_to_show: list = None,
+    num_grid: int = 50,
 ):
     agg_results = {}
 
@@ -281,6 +360,7 @@ def plot_results(
             show_seeds=show_seeds,
             ax=ax,
             methods_to_show=methods_to_show,
+            num_grid=num_grid,
         )
         if title is not None:
             ax.set_title(title)
@@ -297,7 +377,9 @@ def plot_results(
         ax = None
 
 
-def compute_best_value_over_time(benchmarks_to_df, methods_to_show):
+def compute_best_value_over_time(
+    benchmarks_to_df, methods_to_show, verbose=False, num_grid: int = 10
+):
     def get_results(df_task, methods_to_show):
         seed_results = {}
         if len(df_task) > 0:
@@ -305,34 +387,21 @@ def compute_best_value_over_time(benchmarks_to_df, methods_to_show):
             mode = df_task.loc[:, "metric_mode"].values[0]
 
             t_max = df_task.loc[:, ST_TUNER_TIME].max()
-            t_range = np.linspace(0, t_max, 10)
+            t_range = np.linspace(0, t_max, num_grid)
 
+            packed = _pack(df_task, metric, mode)
             for algorithm in methods_to_show:
-                ts = []
-                ys = []
-
-                df_scheduler = df_task[df_task.algorithm == algorithm]
-                for i, tuner_name in enumerate(df_scheduler.tuner_name.unique()):
-                    sub_df = df_scheduler[df_scheduler.tuner_name == tuner_name]
-                    sub_df = sub_df.sort_values(ST_TUNER_TIME)
-                    t = sub_df.loc[:, ST_TUNER_TIME].values
-                    y_best = (
-                        sub_df.loc[:, metric].cummax().values
-                        if mode == "max"
-                        else sub_df.loc[:, metric].cummin().values
-                    )
-                    ts.append(t)
-                    ys.append(y_best)
+                # no skipping here: results must stay aligned with methods_to_show
+                t, y_best, tuner_id = packed[algorithm]
+                ts = _split_by_tuner(t, tuner_id)
+                ys = _split_by_tuner(y_best, tuner_id)
 
                 # for each seed, find the best value at each regularly spaced time-step
-                y_ranges = []
-                for t, y in zip(ts, ys):
-                    indices = np.searchsorted(t, t_range, side="left")
-                    y_range = y[np.clip(indices, 0, len(y) - 1)]
-                    y_ranges.append(y_range)
-
                 # (num_seeds, num_time_steps)
-                y_ranges = np.stack(y_ranges)
+                y_ranges = np.empty((len(ts), t_range.size), dtype=y_best.dtype)
+                for i, (t_tuner, y_tuner) in enumerate(zip(ts, ys)):
+                    indices = np.searchsorted(t_tuner, t_range, side="left")
+                    y_ranges[i] = y_tuner[indices.clip(max=len(y_tuner) - 1)]
 
                 seed_results[algorithm] = y_ranges
 
@@ -340,7 +409,10 @@ def compute_best_value_over_time(benchmarks_to_df, methods_to_show):
         return t_range, seed_results
 
     benchmark_results = []
-    for benchmark, df_task in tqdm(list(benchmarks_to_df.items())):
+    benchmarks_iter = benchmarks_to_df.items()
+    if verbose:
+        benchmarks_iter = tqdm(benchmarks_iter, total=len(benchmarks_to_df))
+    for benchmark, df_task in benchmarks_iter:
         # (num_seeds, num_time_steps)
         _, seed_results_dict = get_results(df_task, methods_to_show)
 
@@ -359,15 +431,11 @@ def compute_best_value_over_time(benchmarks_to_df, methods_to_show):
     benchmark_results = np.stack([b[:, :min_num_seeds, :] for b in benchmark_results])
 
     # (num_benchmarks, num_methods, num_min_seeds, num_time_steps)
-    return methods_to_show, np.stack(benchmark_results)
+    return methods_to_show, benchmark_results
 
 
 def print_rank_table(benchmarks_to_df, methods_to_show: Optional[List[str]]):
-    from sklearn.preprocessing import QuantileTransformer
-    from benchmarking.nursery.benchmark_automl.results_analysis.utils import (
-        compute_best_value_over_time,
-    )
-    import pandas as pd
+    from scipy.stats import rankdata
 
     benchmarks = ["fcnet", "nas201", "lcbench"]
 
@@ -394,13 +462,14 @@ def print_rank_table(benchmarks_to_df, methods_to_show: Optional[List[str]]):
         # (num_methods, num_benchmarks, num_min_seeds, num_time_steps)
         benchmark_results = benchmark_results.swapaxes(0, 1)
 
-        # (num_methods, num_benchmarks * num_min_seeds * num_time_steps)
-        ranks = QuantileTransformer().fit_transform(
-            benchmark_results.reshape(len(benchmark_results), -1)
-        )
-        # ranks_std = ranks.std(axis=-1).mean(axis=0)
+        # (num_methods, num_benchmarks, num_min_seeds, num_time_steps)
+        # rank of each method in [0, 1], computed independently for every
+        # benchmark, seed and time step
+        num_methods = len(benchmark_results)
+        ranks = (rankdata(benchmark_results, axis=0) - 1) / max(num_methods - 1, 1)
+        # ranks_std = ranks.std(axis=(1, 2, 3)).mean(axis=0)
         row = {"benchmark": benchmark}
-        row.update(dict(zip(methods_to_show, ranks.mean(axis=-1))))
+        row.update(dict(zip(methods_to_show, ranks.mean(axis=(1, 2, 3)))))
         rows.append(row)
         print(row)
     df_ranks = pd.DataFrame(rows).set_index("benchmark")
@@ -424,23 +493,25 @@ def load_and_cache(
     methods_to_show=None,
 ):
 
-    result_file = Path(
-        f"~/Downloads/cached-results-{str(experiment_tag)}.dill"
-    ).expanduser()
-    if load_cache_if_exists and result_file.exists():
-        with catchtime(f"loading results from {result_file}"):
-            with open(result_file, "rb") as f:
-                benchmarks_to_df = dill.load(f)
+    cache_dir = Path(f"~/Downloads/cached-results-{str(experiment_tag)}").expanduser()
+    if load_cache_if_exists and cache_dir.exists():
+        with catchtime(f"loading results from {cache_dir}"):
+            benchmarks_to_df = {
+                path.stem: pd.read_parquet(path)
+                for path in sorted(cache_dir.glob("*.parquet"))
+            }
     else:
-        print(f"regenerating results to {result_file}")
+        print(f"regenerating results to {cache_dir}")
         benchmarks_to_df = generate_df_dict(
             experiment_tag,
             date_min=None,
             date_max=None,
             methods_to_show=methods_to_show,
         )
-        # metrics = df.metric_names
-        with open(result_file, "wb") as f:
-            dill.dump(benchmarks_to_df, f)
+        # dataframes only contain ``result_columns`` and the metric, see
+        # ``generate_df_dict``
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        for benchmark, df in benchmarks_to_df.items():
+            df.to_parquet(cache_dir / f"{benchmark}.parquet", compression="snappy")
 
     return benchmarks_to_df
@@ -154,6 +154,7 @@ def load_experiment(
     load_tuner: bool = False,
     local_path: Optional[str] = None,
     experiment_name: Optional[str] = None,
+    columns: Optional[List[str]] = None,
 ) -> ExperimentResult:
     """Load results from an experiment
 
@@ -163,6 +164,8 @@ def load_experiment(
     :param local_path: Path containing the experiment to load. If not specified,
         ``~/{SYNE_TUNE_FOLDER}/`` is used.
     :param experiment_name: If given, this is used as first directory.
+    :param columns: If given, only these columns of the results are loaded.
+        Names which are not present in the results are ignored
     :return: Result object
     """
     path = experiment_path(tuner_name, local_path)
@@ -179,11 +182,19 @@ def load_experiment(
             metadata = json.load(f)
     except FileNotFoundError:
         metadata = None
+    if columns is not None:
+        columns = set(columns)
+
+        def usecols(name: str) -> bool:
+            return name in columns
+
+    else:
+        usecols = None
     try:
         if (path / "results.csv.zip").exists():
-            results = pd.read_csv(path / "results.csv.zip")
+            results = pd.read_csv(path / "results.csv.zip", usecols=usecols)
         else:
-            results = pd.read_csv(path / "results.csv")
+            results = pd.read_csv(path / "results.csv", usecols=usecols)
     except Exception:
         results = None
     if load_tuner:
@@ -261,6 +272,7 @@ def list_experiments(
     experiment_filter: Optional[ExperimentFilter] = None,
     root: Path = experiment_path(),
     load_tuner: bool = False,
+    columns: Optional[List[str]] = None,
 ) -> List[ExperimentResult]:
     """List experiments for which results are found
 
@@ -271,6 +283,8 @@ def list_experiments(
     :param root: Root path for experiment results. Default is result of
         :func:`experiment_path`
     :param load_tuner: Whether to load the tuner in addition to metadata and results
+    :param columns: If given, only these columns of the results are loaded.
+        See :func:`load_experiment`
     :return: List of result objects
     """
     path_filter = _impute_filter(path_filter)
@@ -281,7 +295,7 @@ def list_experiments(
         tuner_name = path.name
         if path_filter(str(metadata_path)):
             result = load_experiment(
-                tuner_name, load_tuner, local_path=str(path.parent)
+                tuner_name, load_tuner, local_path=str(path.parent), columns=columns
             )
             if (
                 experiment_filter(result)
@@ -301,6 +315,7 @@ def load_experiments_df(
     experiment_filter: Optional[ExperimentFilter] = None,
     root: Path = experiment_path(),
     load_tuner: bool = False,
+    columns: Optional[List[str]] = None,
 ) -> pd.DataFrame:
     """
     :param path_filter: If passed then only experiments whose path matching
@@ -310,6 +325,9 @@ def load_experiments_df(
     :param root: Root path for experiment results. Default is
         :func:`experiment_path`
     :param load_tuner: Whether to load the tuner in addition to metadata and results
+    :param columns: If given, only these columns are kept, both from results
+        and metadata. This can save a lot of time and memory if results
+        contain many columns. Names which are not present are ignored
     :return: Dataframe that contains all evaluations reported by tuners according
         to the filter given. The columns contain trial-id, hyperparameter
         evaluated, metrics reported via :class:`~syne_tune.Reporter`. These metrics
@@ -325,26 +343,35 @@ def load_experiments_df(
         * ``entry_point_name``, ``entry_point_path`` name and path of the entry
           point that was tuned
     """
+    if columns is not None:
+        columns = set(columns)
+
+    def keep_column(name: str) -> bool:
+        return columns is None or name in columns
+
     dfs = []
     for experiment in list_experiments(
         path_filter=path_filter,
         experiment_filter=experiment_filter,
         root=root,
         load_tuner=load_tuner,
+        columns=columns,
     ):
         assert experiment.results is not None
         assert experiment.metadata is not None
 
         df = experiment.results
-        df["tuner_name"] = experiment.name
+        if keep_column("tuner_name"):
+            df["tuner_name"] = experiment.name
         for k, v in experiment.metadata.items():
             if isinstance(v, List):
                 if len(v) > 1:
                     for i, x in enumerate(v):
-                        df[f"{k}-{i}"] = x
-                else:
+                        if keep_column(f"{k}-{i}"):
+                            df[f"{k}-{i}"] = x
+                elif keep_column(k):
                     df[k] = v[0]
-            else:
+            elif keep_column(k):
                 df[k] = v
         dfs.append(df)
     return pd.concat(dfs, ignore_index=True)
@@ -31,32 +31,23 @@ def test_incremental_update():
 
     numpy.random.seed(298424)
     std_noise = 0.01
+    num_reps = 10
 
-    # Sample data
-    features_list = []
-    targets_list = []
-    num_incr_list = []
-    for rep in range(10):
-        num_train = anp.random.randint(low=5, high=15)
-        num_incr = anp.random.randint(low=1, high=7)
-        num_incr_list.append(num_incr)
-        sizes = [num_train, num_incr]
-        features = []
-        targets = []
-        for sz in sizes:
-            feats = anp.random.uniform(low=-1.0, high=1.0, size=sz).reshape((-1, 1))
-            features.append(feats)
-            targs = f(feats)
-            targs += anp.random.normal(0.0, std_noise, size=targs.shape)
-            targets.append(targs)
+    # Sample data for all repetitions at once
+    all_num_train = numpy.random.randint(low=5, high=15, size=num_reps)
+    all_num_incr = numpy.random.randint(low=1, high=7, size=num_reps)
+    max_total = numpy.max(all_num_train + all_num_incr)
+    all_feats = numpy.random.uniform(low=-1.0, high=1.0, size=(num_reps, max_total, 1))
+    all_noise = numpy.random.normal(0.0, std_noise, size=(num_reps, max_total, 1))
+    all_targets = f(all_feats) + all_noise
 
-        features_list.append(features)
-        targets_list.append(targets)
-
-    for rep in range(10):
+    for rep in range(num_reps):
+        num_train = all_num_train[rep]
+        num_incr = all_num_incr[rep]
+        num_total = num_train + num_incr
+        features = [all_feats[rep, :num_train], all_feats[rep, num_train:num_total]]
+        targets = [all_targets[rep, :num_train], all_targets[rep, num_train:num_total]]
         model = GaussianProcessRegression(kernel=Matern52(dimension=1))
-        features = features_list[rep]
-        targets = targets_list[rep]
         # Posterior state by incremental updating
         data = {"features": features[0], "targets": targets[0]}
         model.fit(data)
@@ -67,7 +58,6 @@ def test_incremental_update():
             kernel=model.likelihood.kernel,
             noise_variance=model.likelihood.get_noise_variance(as_ndarray=True),
         )
-        num_incr = num_incr_list[rep]
         for i in range(num_incr):
             state_incr = state_incr.update(
                 features[1][i].reshape((1, -1)), targets[1][i].reshape((1, -1))
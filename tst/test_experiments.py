@@ -0,0 +1,46 @@
+# Copyright 2021 Amazon.com, Inc. or its affiliates. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License").
+# You may not use this file except in compliance with the License.
+# A copy of the License is located at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# or in the "license" file accompanying this file. This file is distributed
+# on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either
+# express or implied. See the License for the specific language governing
+# permissions and limitations under the License.
+import json
+
+import pandas as pd
+
+from syne_tune.constants import ST_TUNER_CREATION_TIMESTAMP, ST_TUNER_TIME
+from syne_tune.experiments import load_experiments_df
+
+
+def test_load_experiments_df_columns(tmp_path):
+    for tuner_name in ["tuner-1", "tuner-2"]:
+        path = tmp_path / tuner_name
+        path.mkdir()
+        metadata = {
+            ST_TUNER_CREATION_TIMESTAMP: 0.0,
+            "algorithm": "RS",
+            "metric_names": ["loss"],
+            "metric_mode": "min",
+        }
+        with open(path / "metadata.json", "w") as f:
+            json.dump(metadata, f)
+        results = pd.DataFrame(
+            {"loss": [3.0, 1.0], ST_TUNER_TIME: [1.0, 2.0], "config_x": [1, 2]}
+        )
+        results.to_csv(path / "results.csv", index=False)
+
+    df = load_experiments_df(root=tmp_path)
+    assert len(df) == 4
+    assert {"config_x", "algorithm", "metric_mode"}.issubset(df.columns)
+
+    columns = ["loss", ST_TUNER_TIME, "tuner_name", "metric_names", "not_present"]
+    df = load_experiments_df(root=tmp_path, columns=columns)
+    assert len(df) == 4
+    assert set(df.columns) == {"loss", ST_TUNER_TIME, "tuner_name", "metric_names"}
+    assert set(df.tuner_name) == {"tuner-1", "tuner-2"}